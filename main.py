@@ -3,6 +3,7 @@
 import logging
 import structlog
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Dict, Any
 
 from src.graph.workflow import MeeraWorkflow
@@ -27,7 +28,7 @@ structlog.configure(
     wrapper_class=structlog.stdlib.BoundLogger,
     context_class=dict,
     logger_factory=structlog.stdlib.LoggerFactory(),
-    cache_logger_on_first_use=False,
+    cache_logger_on_first_use=True,
 )
 
 logger = structlog.get_logger()
@@ -35,6 +36,9 @@ logger = structlog.get_logger()
 # Reusable global workflow
 workflow: Optional[MeeraWorkflow] = None
 
+# Background pool for post-response writes that the caller never waits on
+background_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="meera-bg")
+
 
 def init_workflow() -> MeeraWorkflow:
     global workflow
@@ -43,6 +47,13 @@ def init_workflow() -> MeeraWorkflow:
     return workflow
 
 
+def _log_save_failure(future: Future) -> None:
+    """Log errors from a background save_interaction call."""
+    error = future.exception()
+    if error is not None:
+        logger.error("Failed to save interaction to Supabase", error=str(error))
+
+
 def run_meera(user_id: str, user_message: str) -> Dict[str, Any]:
     """
     Core entrypoint used by API and CLI.
@@ -56,10 +67,12 @@ def run_meera(user_id: str, user_message: str) -> Dict[str, Any]:
         user_message=user_message
     )
 
-    # Persist into Supabase
+    # Persist into Supabase off the request path
     try:
-        save_interaction(user_id, user_message, result)
-    except Exception as e:
+        future = background_executor.submit(save_interaction, user_id, user_message, result)
+        future.add_done_callback(_log_save_failure)
+    except RuntimeError as e:
+        # Executor already shut down (process exiting)
         logger.error("Failed to save interaction to Supabase", error=str(e))
 
     return result
@@ -94,6 +107,8 @@ def main():
         logger.error("Fatal error", error=str(e))
         sys.exit(1)
     finally:
+        # Let pending Supabase writes finish before the process exits
+        background_executor.shutdown(wait=True)
         if workflow is not None:
             workflow.close()
 
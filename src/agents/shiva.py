@@ -87,7 +87,9 @@ class ShivaAgent:
                 
                 if memory_node:
                     memory_id = self.memory_storage.save_memory(memory_node)
-                    memory_ids.append(memory_id)
+                    # A reinforced duplicate comes back with an id we may already hold
+                    if memory_id not in memory_ids:
+                        memory_ids.append(memory_id)
             
             # Update user identity if provided
             if user_identity:
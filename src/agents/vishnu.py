@@ -1,6 +1,8 @@
 """Vishnu Agent: Dynamic system prompt builder."""
 
 import structlog
+from datetime import datetime, timezone
+from functools import lru_cache
 from typing import Dict, Any, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 
@@ -11,6 +13,14 @@ from src.utils.config import settings, config_loader
 
 logger = structlog.get_logger()
 
+# Static parts of the intent prompt, joined around the message per call
+_INTENT_PROMPT_PREFIX = (
+    'Analyze the following user message and identify the primary intent in one short phrase '
+    '(e.g., "question about consciousness", "emotional support", "technical inquiry", '
+    '"philosophical discussion").\n\nUser message: '
+)
+_INTENT_PROMPT_SUFFIX = "\n\nIntent:"
+
 
 class VishnuAgent:
     """
@@ -30,6 +40,8 @@ class VishnuAgent:
         self.prompt_builder = PromptBuilder()
         self.config = config_loader.load()
         self.agent_config = self.config.get("agents", {}).get("vishnu", {})
+        self._intent_detection_enabled = bool(self.agent_config.get("intent_detection", True))
+        self._identity_update_enabled = bool(self.agent_config.get("identity_update", True))
         
         # Intent detection LLM (lightweight)
         # Using gemini-2.0-flash-lite instead of gemini-2.0-flash-exp for free tier compatibility
@@ -38,7 +50,12 @@ class VishnuAgent:
             model="gemini-flash-latest",
             google_api_key=settings.gemini_api_key,
             temperature=0.3
-        ) if self.agent_config.get("intent_detection", True) else None
+        ) if self._intent_detection_enabled else None
+        
+        # Memoize intents per normalized message; failed calls raise and are not cached
+        self._cached_intent = lru_cache(
+            maxsize=self.agent_config.get("intent_cache_size", 2048)
+        )(self._invoke_intent_llm)
         
         logger.info("Vishnu Agent initialized")
     
@@ -68,15 +85,11 @@ class VishnuAgent:
         user_identity = self._update_identity(user_identity, user_message, intent)
         
         # Step 3: Retrieve memories
-        personal_memories = self.memory_retriever.retrieve_personal_memories(
+        personal_memories, hive_mind_memories = self.memory_retriever.retrieve_all(
             user_id=user_id,
             query=user_message
         )
         
-        hive_mind_memories = self.memory_retriever.retrieve_hive_mind_memories(
-            query=user_message
-        )
-        
         # Step 4: Build dynamic system prompt
         system_prompt = self.prompt_builder.build_system_prompt(
             user_identity=user_identity,
@@ -106,14 +119,8 @@ class VishnuAgent:
             return None
         
         try:
-            prompt = f"""Analyze the following user message and identify the primary intent in one short phrase (e.g., "question about consciousness", "emotional support", "technical inquiry", "philosophical discussion").
-
-User message: {user_message}
-
-Intent:"""
-            
-            response = self.intent_llm.invoke(prompt)
-            intent = response.content.strip() if hasattr(response, 'content') else str(response).strip()
+            # Repeated questions differ mostly in case and whitespace
+            intent = self._cached_intent(" ".join(user_message.lower().split()))
             
             logger.debug("Intent detected", intent=intent)
             return intent
@@ -123,6 +130,12 @@ Intent:"""
             logger.warning("Failed to detect intent, continuing without intent", error=str(e))
             return None
     
+    def _invoke_intent_llm(self, user_message: str) -> str:
+        """Call the intent LLM for a normalized user message."""
+        prompt = _INTENT_PROMPT_PREFIX + user_message + _INTENT_PROMPT_SUFFIX
+        response = self.intent_llm.invoke(prompt)
+        return response.content.strip() if hasattr(response, 'content') else str(response).strip()
+    
     def _get_or_create_identity(self, user_id: str) -> UserIdentity:
         """Get existing user identity or create a new one."""
         identity = self.memory_retriever.get_user_identity(user_id)
@@ -140,16 +153,15 @@ Intent:"""
         intent: Optional[str]
     ) -> UserIdentity:
         """Update user identity based on message and intent."""
-        if not self.agent_config.get("identity_update", True):
+        if not self._identity_update_enabled:
             return identity
         
         # For now, we'll do basic updates
         # In production, this could use an LLM to extract identity-relevant information
         # This is a simplified version - you can enhance it with LLM-based extraction
         
-        # Update timestamp
-        from datetime import datetime
-        identity.updated_at = datetime.utcnow()
+        # Update timestamp (naive UTC, like created_at and the other stored timestamps)
+        identity.updated_at = datetime.now(timezone.utc).replace(tzinfo=None)
         
         # Basic heuristics for identity updates could go here
         # For production, consider using an LLM to extract structured identity updates
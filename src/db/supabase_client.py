@@ -1,8 +1,9 @@
 # src/db/supabase_client.py
-import os
 from typing import Any, Dict
 from supabase import create_client, Client
 
+from src.utils.config import get_settings
+
 _supabase: Client | None = None
 
 
@@ -12,9 +13,10 @@ def get_supabase() -> Client:
     """
     global _supabase
     if _supabase is None:
-        url = os.environ["SUPABASE_URL"]
-        key = os.environ["SUPABASE_SERVICE_ROLE_KEY"]
-        _supabase = create_client(url, key)
+        settings = get_settings()
+        if not settings.supabase_url or not settings.supabase_service_role_key:
+            raise RuntimeError("SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set")
+        _supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
     return _supabase
 
 
@@ -1,7 +1,7 @@
 """LangGraph workflow orchestrating Vishnu → Brahma → Shiva flow."""
 
 import structlog
-from typing import TypedDict, Annotated, Sequence
+from typing import TypedDict, Annotated, List, Optional, Sequence
 from langgraph.graph import StateGraph, END
 
 from src.agents.vishnu import VishnuAgent
@@ -9,6 +9,7 @@ from src.agents.brahma import BrahmaInterface
 from src.agents.shiva import ShivaAgent
 from src.memory.storage import MemoryStorage
 from src.memory.retrieval import MemoryRetriever
+from src.memory.nodes import MemoryNode, UserIdentity
 
 logger = structlog.get_logger()
 
@@ -20,9 +21,9 @@ class AgentState(TypedDict):
     
     # Vishnu outputs
     system_prompt: str
-    user_identity: dict
-    personal_memories: list
-    hive_mind_memories: list
+    user_identity: Optional[UserIdentity]
+    personal_memories: List[MemoryNode]
+    hive_mind_memories: List[MemoryNode]
     intent: str
     
     # Brahma outputs
@@ -86,24 +87,11 @@ class MeeraWorkflow:
             # Update state with Vishnu outputs
             state["system_prompt"] = result["system_prompt"]
             
-            # Convert Pydantic models to dicts
-            user_identity = result["user_identity"]
-            if hasattr(user_identity, "model_dump"):
-                state["user_identity"] = user_identity.model_dump()
-            elif hasattr(user_identity, "dict"):
-                state["user_identity"] = user_identity.dict()
-            else:
-                state["user_identity"] = user_identity
-            
-            # Convert memory lists
-            state["personal_memories"] = [
-                m.model_dump() if hasattr(m, "model_dump") else (m.dict() if hasattr(m, "dict") else m)
-                for m in result["personal_memories"]
-            ]
-            state["hive_mind_memories"] = [
-                m.model_dump() if hasattr(m, "model_dump") else (m.dict() if hasattr(m, "dict") else m)
-                for m in result["hive_mind_memories"]
-            ]
+            # Keep the identity model as-is; Shiva consumes the same instance
+            state["user_identity"] = result["user_identity"]
+            
+            state["personal_memories"] = result["personal_memories"]
+            state["hive_mind_memories"] = result["hive_mind_memories"]
             state["intent"] = result.get("intent", "")
             
             logger.info("Vishnu node completed", user_id=state["user_id"])
@@ -159,15 +147,10 @@ class MeeraWorkflow:
         logger.info("Shiva node executing", user_id=state["user_id"])
         
         try:
-            # Reconstruct user identity from dict
-            from src.memory.nodes import UserIdentity
-            user_identity_dict = state.get("user_identity", {})
-            user_identity = UserIdentity(**user_identity_dict) if user_identity_dict else None
-            
             memory_ids = self.shiva.process(
                 user_id=state["user_id"],
                 full_conversation=state["full_conversation"],
-                user_identity=user_identity
+                user_identity=state.get("user_identity")
             )
             
             # Update state with Shiva outputs
@@ -207,7 +190,7 @@ class MeeraWorkflow:
             "user_id": user_id,
             "user_message": user_message,
             "system_prompt": "",
-            "user_identity": {},
+            "user_identity": None,
             "personal_memories": [],
             "hive_mind_memories": [],
             "intent": "",
@@ -219,13 +202,14 @@ class MeeraWorkflow:
         
         try:
             final_state = self.graph.invoke(initial_state)
+            response = final_state.get("response", "")
             
             logger.info("Workflow completed",
                        user_id=user_id,
-                       response_length=len(final_state.get("response", "")))
+                       response_length=len(response))
             
             return {
-                "response": final_state.get("response", ""),
+                "response": response,
                 "user_id": user_id,
                 "intent": final_state.get("intent", ""),
                 "memory_ids": final_state.get("memory_ids", []),
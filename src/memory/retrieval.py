@@ -1,8 +1,17 @@
 """Memory retrieval logic for Vishnu Agent."""
 
+import re
+import threading
+import time
+import numpy as np
 import structlog
-from typing import List, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
+from typing import Any, Hashable, List, Optional, Tuple
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
 from src.memory.storage import MemoryStorage
 from src.memory.nodes import MemoryNode, UserIdentity
@@ -10,6 +19,152 @@ from src.utils.config import settings
 
 logger = structlog.get_logger()
 
+# Shared pool for lookups that run alongside the caller's own vector search
+_executor = ThreadPoolExecutor(
+    max_workers=settings.retrieval_pool_size,
+    thread_name_prefix="meera-retrieval"
+)
+
+# HTTP statuses worth retrying before giving up on vector search for this turn
+_TRANSIENT_STATUSES = frozenset({429, 500, 503, 504})
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """Best-effort HTTP status of an SDK error, whichever Google client raised it."""
+    # google-api-core exposes ``code``; google-genai exposes ``code``/``status_code``
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _is_transient(error: BaseException) -> bool:
+    """Whether an error, or the error it wraps, is worth retrying."""
+    # langchain-google-genai re-raises API errors wrapped in its own exception type
+    while error is not None:
+        if isinstance(error, TimeoutError) or _status_code(error) in _TRANSIENT_STATUSES:
+            return True
+        error = error.__cause__
+    return False
+
+
+# Embeddings client shared by every retriever; built on first use
+_EMBEDDINGS: Optional[GoogleGenerativeAIEmbeddings] = None
+_EMBEDDINGS_LOCK = threading.Lock()
+
+
+def _get_embeddings() -> GoogleGenerativeAIEmbeddings:
+    """Return the process-wide embeddings client, creating it once."""
+    global _EMBEDDINGS
+    if _EMBEDDINGS is None:
+        with _EMBEDDINGS_LOCK:
+            if _EMBEDDINGS is None:
+                _EMBEDDINGS = GoogleGenerativeAIEmbeddings(
+                    model=settings.embedding_model,
+                    google_api_key=settings.gemini_api_key
+                )
+    return _EMBEDDINGS
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "do", "for", "from",
+    "hi", "hello", "hey", "i", "if", "in", "is", "it", "me", "my", "no",
+    "of", "ok", "okay", "on", "or", "so", "that", "the", "this", "to", "us",
+    "was", "we", "yes", "you",
+})
+
+
+def _to_f32(vec: List[float]) -> np.ndarray:
+    """Pack an embedding into a contiguous float32 array (4 bytes per dim)."""
+    return np.ascontiguousarray(vec, dtype=np.float32)
+
+
+def _drop_near_duplicates(memories: List[MemoryNode], threshold: float) -> List[MemoryNode]:
+    """
+    Drop memories whose embedding has cosine similarity above ``threshold``
+    with an earlier (higher-ranked) memory. Memories without embeddings are kept.
+    """
+    indexed = [i for i, m in enumerate(memories) if m.embedding]
+    if len(indexed) < 2 or len({len(memories[i].embedding) for i in indexed}) != 1:
+        return memories
+    
+    matrix = np.asarray([memories[i].embedding for i in indexed], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-12
+    similar = (matrix @ matrix.T) > threshold
+    
+    dropped = set()
+    for row in range(len(indexed)):
+        if indexed[row] in dropped:
+            continue
+        for col in np.flatnonzero(similar[row, row + 1:]) + row + 1:
+            dropped.add(indexed[col])
+    
+    if not dropped:
+        return memories
+    return [m for i, m in enumerate(memories) if i not in dropped]
+
+
+def _is_low_signal_query(normalized_query: str) -> bool:
+    """Whether a normalized query is made up entirely of stopwords (greetings, fillers)."""
+    return all(token in _STOPWORDS for token in _TOKEN_RE.findall(normalized_query))
+
+
+def _normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace so trivially different queries share cache keys."""
+    return " ".join(query.lower().split())
+
+
+@dataclass(slots=True)
+class RetrievalRequest:
+    """A user query prepared once and shared by every retrieval stage."""
+    raw: str
+    normalized: str
+    preview: str
+    embedding: Optional[np.ndarray] = None
+    
+    @classmethod
+    def build(cls, query: str) -> "RetrievalRequest":
+        """Derive the normalized cache key and log preview from a raw query."""
+        return cls(raw=query, normalized=_normalize_query(query), preview=query[:80])
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache with a per-entry TTL."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        """Initialize an empty cache holding at most ``maxsize`` entries."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return a cached value, or None on a miss or expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
 
 class MemoryRetriever:
     """Handles intelligent memory retrieval for context building."""
@@ -17,9 +172,15 @@ class MemoryRetriever:
     def __init__(self, storage: MemoryStorage):
         """Initialize memory retriever with storage backend."""
         self.storage = storage
-        self.embeddings = GoogleGenerativeAIEmbeddings(
-            model=settings.embedding_model,
-            google_api_key=settings.gemini_api_key
+        self.embeddings = _get_embeddings()
+        self.embedding_cache = TTLCache(
+            maxsize=settings.embedding_cache_size,
+            ttl=settings.embedding_cache_ttl
+        )
+        # Hive mind results are user-independent, so identical queries share them
+        self.hive_mind_cache = TTLCache(
+            maxsize=settings.hive_mind_cache_size,
+            ttl=settings.hive_mind_cache_ttl
         )
         logger.info("Memory retriever initialized")
     
@@ -27,6 +188,100 @@ class MemoryRetriever:
         """Retrieve user identity profile."""
         return self.storage.get_user_identity(user_id)
     
+    def _embed_query(self, request: RetrievalRequest) -> np.ndarray:
+        """Embed a query as float32, reusing a cached vector for repeated queries."""
+        if request.embedding is not None:
+            return request.embedding
+        
+        key = (settings.embedding_model, request.normalized)
+        embedding = self.embedding_cache.get(key)
+        if embedding is None:
+            embedding = _to_f32(self._embed_single(request.raw))
+            self.embedding_cache.put(key, embedding)
+        request.embedding = embedding
+        return embedding
+    
+    def _hive_mind_cache_key(self, request: RetrievalRequest, limit: int) -> Tuple[int, str, int]:
+        """Key hive mind results by store version so any hive mind write invalidates them."""
+        return self.storage.hive_mind_version, request.normalized, limit
+    
+    @retry(
+        retry=retry_if_exception(_is_transient),
+        wait=wait_exponential(multiplier=0.1, max=2),
+        stop=stop_after_attempt(3),
+        reraise=True
+    )
+    def _embed_single(self, query: str) -> List[float]:
+        """Embed one query with the shared embeddings client."""
+        return self.embeddings.embed_query(query)
+    
+    def _search(
+        self,
+        query_embedding: np.ndarray,
+        user_id: Optional[str],
+        is_hive_mind: bool,
+        limit: int
+    ) -> List[MemoryNode]:
+        """Run the vector search for one scope."""
+        return self.storage.search_memories(
+            query_embedding=query_embedding,
+            user_id=user_id,
+            is_hive_mind=is_hive_mind,
+            limit=limit
+        )
+    
+    def _start_recent(
+        self,
+        user_id: Optional[str],
+        is_hive_mind: bool,
+        limit: int
+    ) -> Future:
+        """Start a speculative recent-memories lookup on the retrieval pool."""
+        return _executor.submit(
+            self.storage.get_recent_memories,
+            user_id=user_id,
+            is_hive_mind=is_hive_mind,
+            limit=limit
+        )
+    
+    def _finish_search(
+        self,
+        memories: List[MemoryNode],
+        recent: Future,
+        limit: int
+    ) -> List[MemoryNode]:
+        """Top up vector search results with recent memories when they are short."""
+        threshold = settings.dedup_cosine_threshold
+        memories = _drop_near_duplicates(memories, threshold)
+        
+        if len(memories) >= limit:
+            recent.cancel()
+            return memories[:limit]
+        
+        # Vector search returned few results; fall back to recent memories
+        recent_memories = recent.result()
+        if recent_memories:
+            # Merge and deduplicate by id, keeping vector-search order first
+            merged = {m.memory_id: m for m in chain(memories, recent_memories)}
+            memories = _drop_near_duplicates(list(merged.values()), threshold)
+        
+        return memories[:limit]
+    
+    def _search_with_fallback(
+        self,
+        query_embedding: np.ndarray,
+        user_id: Optional[str],
+        is_hive_mind: bool,
+        limit: int
+    ) -> List[MemoryNode]:
+        """Vector search on this thread while the recent fallback is fetched alongside."""
+        recent = self._start_recent(user_id, is_hive_mind, limit)
+        return self._finish_search(
+            self._search(query_embedding, user_id, is_hive_mind, limit),
+            recent,
+            limit
+        )
+    
     def retrieve_personal_memories(
         self,
         user_id: str,
@@ -36,42 +291,30 @@ class MemoryRetriever:
         """Retrieve relevant personal memories for a user query."""
         if limit is None:
             limit = settings.max_personal_memories
+        request = RetrievalRequest.build(query)
+        log = logger.bind(query_preview=request.preview)
         
-        try:
-            # Generate query embedding
-            query_embedding = self.embeddings.embed_query(query)
-            
-            # Search for relevant memories
-            memories = self.storage.search_memories(
-                query_embedding=query_embedding,
+        # Greetings and filler match everything equally; skip the embedding call
+        if _is_low_signal_query(request.normalized):
+            return self.storage.get_recent_memories(
                 user_id=user_id,
                 is_hive_mind=False,
                 limit=limit
             )
+        
+        try:
+            query_embedding = self._embed_query(request)
+            memories = self._search_with_fallback(query_embedding, user_id, False, limit)
             
-            # If vector search returns few results, fall back to recent memories
-            if len(memories) < limit:
-                recent = self.storage.get_recent_memories(
+            log.info("Personal memories retrieved",
                     user_id=user_id,
-                    is_hive_mind=False,
-                    limit=limit - len(memories)
-                )
-                # Merge and deduplicate
-                existing_ids = {m.memory_id for m in memories}
-                for mem in recent:
-                    if mem.memory_id not in existing_ids:
-                        memories.append(mem)
-            
-            logger.info("Personal memories retrieved",
-                       user_id=user_id,
-                       count=len(memories),
-                       query_preview=query[:50])
-            return memories[:limit]
+                    count=len(memories))
+            return memories
             
         except Exception as e:
-            logger.error("Failed to retrieve personal memories",
-                        error=str(e),
-                        user_id=user_id)
+            log.error("Failed to retrieve personal memories",
+                     error=str(e),
+                     user_id=user_id)
             # Fallback to recent memories
             return self.storage.get_recent_memories(
                 user_id=user_id,
@@ -87,43 +330,111 @@ class MemoryRetriever:
         """Retrieve relevant hive mind (shared) memories."""
         if limit is None:
             limit = settings.max_hive_mind_memories
+        request = RetrievalRequest.build(query)
+        log = logger.bind(query_preview=request.preview)
         
-        try:
-            # Generate query embedding
-            query_embedding = self.embeddings.embed_query(query)
-            
-            # Search for relevant hive mind memories
-            memories = self.storage.search_memories(
-                query_embedding=query_embedding,
+        if _is_low_signal_query(request.normalized):
+            return self.storage.get_recent_memories(
                 user_id=None,
                 is_hive_mind=True,
                 limit=limit
             )
+        
+        cache_key = self._hive_mind_cache_key(request, limit)
+        cached = self.hive_mind_cache.get(cache_key)
+        if cached is not None:
+            return list(cached)
+        
+        try:
+            query_embedding = self._embed_query(request)
+            memories = self._search_with_fallback(query_embedding, None, True, limit)
+            self.hive_mind_cache.put(cache_key, tuple(memories))
             
-            # If vector search returns few results, fall back to recent memories
-            if len(memories) < limit:
-                recent = self.storage.get_recent_memories(
-                    user_id=None,
-                    is_hive_mind=True,
-                    limit=limit - len(memories)
-                )
-                # Merge and deduplicate
-                existing_ids = {m.memory_id for m in memories}
-                for mem in recent:
-                    if mem.memory_id not in existing_ids:
-                        memories.append(mem)
-            
-            logger.info("Hive mind memories retrieved",
-                       count=len(memories),
-                       query_preview=query[:50])
-            return memories[:limit]
+            log.info("Hive mind memories retrieved",
+                    count=len(memories))
+            return memories
             
         except Exception as e:
-            logger.error("Failed to retrieve hive mind memories", error=str(e))
+            log.error("Failed to retrieve hive mind memories", error=str(e))
             # Fallback to recent memories
             return self.storage.get_recent_memories(
                 user_id=None,
                 is_hive_mind=True,
                 limit=limit
             )
-
+    
+    def retrieve_all(
+        self,
+        user_id: str,
+        query: str,
+        personal_limit: Optional[int] = None,
+        hive_limit: Optional[int] = None
+    ) -> Tuple[List[MemoryNode], List[MemoryNode]]:
+        """
+        Retrieve personal and hive mind memories for one user turn.
+        
+        The query is embedded once and the storage lookups for both scopes overlap.
+        
+        Returns:
+            Tuple of (personal_memories, hive_mind_memories)
+        """
+        if personal_limit is None:
+            personal_limit = settings.max_personal_memories
+        if hive_limit is None:
+            hive_limit = settings.max_hive_mind_memories
+        request = RetrievalRequest.build(query)
+        log = logger.bind(query_preview=request.preview)
+        
+        query_embedding = None
+        if not _is_low_signal_query(request.normalized):
+            try:
+                query_embedding = self._embed_query(request)
+            except Exception as e:
+                log.error("Failed to embed query", error=str(e), user_id=user_id)
+        
+        if query_embedding is None:
+            # Fallback to recent memories for both scopes
+            hive_future = _executor.submit(
+                self.storage.get_recent_memories,
+                user_id=None,
+                is_hive_mind=True,
+                limit=hive_limit
+            )
+            personal = self.storage.get_recent_memories(
+                user_id=user_id,
+                is_hive_mind=False,
+                limit=personal_limit
+            )
+            return personal, hive_future.result()
+        
+        hive_key = self._hive_mind_cache_key(request, hive_limit)
+        hive = self.hive_mind_cache.get(hive_key)
+        
+        # Only the recent lookups and the hive mind search leave this thread;
+        # the personal vector search runs inline while they are in flight
+        personal_recent = self._start_recent(user_id, False, personal_limit)
+        if hive is None:
+            hive_recent = self._start_recent(None, True, hive_limit)
+            hive_search = _executor.submit(
+                self._search, query_embedding, None, True, hive_limit
+            )
+            personal = self._finish_search(
+                self._search(query_embedding, user_id, False, personal_limit),
+                personal_recent,
+                personal_limit
+            )
+            hive = self._finish_search(hive_search.result(), hive_recent, hive_limit)
+            self.hive_mind_cache.put(hive_key, tuple(hive))
+        else:
+            personal = self._finish_search(
+                self._search(query_embedding, user_id, False, personal_limit),
+                personal_recent,
+                personal_limit
+            )
+            hive = list(hive)
+        
+        log.info("Memories retrieved",
+                user_id=user_id,
+                personal_count=len(personal),
+                hive_mind_count=len(hive))
+        return personal, hive
@@ -1,11 +1,13 @@
 """Memory storage implementation using MongoDB and ChromaDB."""
 
+import threading
 import structlog
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
-from pymongo import MongoClient
+from pymongo import MongoClient, DESCENDING
 from pymongo.collection import Collection
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
 
 from src.memory.nodes import MemoryNode, UserIdentity, MemoryType
@@ -14,6 +16,11 @@ from src.utils.config import settings
 logger = structlog.get_logger()
 
 
+def _as_list(vec: Union[List[float], np.ndarray]) -> List[float]:
+    """Hand an embedding to Chroma as a plain list of floats."""
+    return vec.tolist() if isinstance(vec, np.ndarray) else list(vec)
+
+
 class MemoryStorage:
     """Handles storage and retrieval of memories using MongoDB and ChromaDB."""
     
@@ -24,6 +31,7 @@ class MemoryStorage:
         self.db = self.mongo_client[settings.mongodb_database]
         self.memory_collection: Collection = self.db[settings.mongodb_memory_collection]
         self.identity_collection: Collection = self.db[settings.mongodb_user_identity_collection]
+        self._ensure_indexes()
         
         # ChromaDB connection for vector search
         self.chroma_client = chromadb.PersistentClient(
@@ -35,13 +43,71 @@ class MemoryStorage:
             metadata={"hnsw:space": "cosine"}
         )
         
+        # Optional low-dimensional index for two-stage (Matryoshka) search
+        self.truncated_dim = settings.retrieval_truncated_dim
+        self.truncated_collection = self.chroma_client.get_or_create_collection(
+            name=f"{settings.chroma_collection_name}_{self.truncated_dim}d",
+            metadata={"hnsw:space": "cosine"}
+        ) if self.truncated_dim > 0 else None
+        # Searches use the truncated index only once it covers every stored vector
+        self.truncated_ready = self._truncated_index_complete()
+        
+        # Bumped on every hive mind write; readers key hive mind caches on it
+        self.hive_mind_version = 0
+        self._hive_mind_version_lock = threading.Lock()
+        
         logger.info("Memory storage initialized", 
                    mongodb_database=settings.mongodb_database,
                    chroma_collection=settings.chroma_collection_name)
     
+    def _truncated_index_complete(self) -> bool:
+        """Whether the truncated index holds as many vectors as the full one."""
+        if self.truncated_collection is None:
+            return False
+        full_count = self.chroma_collection.count()
+        truncated_count = self.truncated_collection.count()
+        if truncated_count < full_count:
+            # Searching it now would silently skip every memory saved before it was enabled
+            logger.warning("Truncated index incomplete; searching the full index until backfilled",
+                           full_count=full_count,
+                           truncated_count=truncated_count,
+                           hint="run `python -m src.memory.storage`")
+            return False
+        return True
+    
+    def _ensure_indexes(self):
+        """Create the indexes behind get_recent_memories (no-op if they exist)."""
+        try:
+            # Personal lookups: is_hive_mind=False, user_id=?, newest first
+            self.memory_collection.create_index(
+                [("user_id", 1), ("timestamp", DESCENDING)],
+                name="personal_user_recent",
+                partialFilterExpression={"is_hive_mind": False}
+            )
+            # Hive mind lookups: is_hive_mind=True across all users, newest first
+            self.memory_collection.create_index(
+                [("timestamp", DESCENDING)],
+                name="hive_mind_recent",
+                partialFilterExpression={"is_hive_mind": True}
+            )
+        except Exception as e:
+            # Missing indexes only cost speed; don't block startup on them
+            logger.warning("Failed to ensure memory indexes", error=str(e))
+    
     def save_memory(self, memory: MemoryNode) -> str:
         """Save a memory node to both MongoDB and ChromaDB."""
         try:
+            # Near-identical memory already stored: reinforce it instead of adding a copy
+            if memory.embedding and settings.duplicate_cosine_threshold > 0:
+                duplicate_id = self.find_duplicate(
+                    embedding=memory.embedding,
+                    user_id=memory.user_id,
+                    is_hive_mind=memory.is_hive_mind
+                )
+                if duplicate_id:
+                    self._reinforce_memory(duplicate_id, memory)
+                    return duplicate_id
+            
             # Convert to dict for MongoDB
             memory_dict = memory.model_dump()
             memory_dict["_id"] = memory.memory_id
@@ -55,18 +121,23 @@ class MemoryStorage:
             
             # Save embedding to ChromaDB if available
             if memory.embedding:
+                metadata = self._chroma_metadata(memory)
                 self.chroma_collection.upsert(
                     ids=[memory.memory_id],
                     embeddings=[memory.embedding],
-                    metadatas=[{
-                        "user_id": memory.user_id,
-                        "memory_type": memory.memory_type.value,
-                        "timestamp": memory.timestamp.isoformat(),
-                        "is_hive_mind": str(memory.is_hive_mind),
-                        "tags": ",".join(memory.tags) if memory.tags else ""
-                    }],
+                    metadatas=[metadata],
                     documents=[memory.content]
                 )
+                if self.truncated_collection is not None:
+                    self.truncated_collection.upsert(
+                        ids=[memory.memory_id],
+                        embeddings=[memory.embedding[:self.truncated_dim]],
+                        metadatas=[metadata],
+                        documents=[memory.content]
+                    )
+            
+            if memory.is_hive_mind:
+                self._bump_hive_mind_version()
             
             logger.info("Memory saved", memory_id=memory.memory_id, user_id=memory.user_id)
             return memory.memory_id
@@ -75,6 +146,111 @@ class MemoryStorage:
             logger.error("Failed to save memory", error=str(e), memory_id=memory.memory_id)
             raise
     
+    def find_duplicate(
+        self,
+        embedding: Union[List[float], np.ndarray],
+        user_id: Optional[str],
+        is_hive_mind: bool
+    ) -> Optional[str]:
+        """
+        Return the id of a stored memory whose cosine similarity to ``embedding``
+        exceeds duplicate_cosine_threshold in the same scope, if any.
+        """
+        if not is_hive_mind and not user_id:
+            # Without an owner the personal scope is undefined; never match other users
+            return None
+        
+        if is_hive_mind:
+            where_clause: Dict[str, Any] = {"is_hive_mind": str(is_hive_mind)}
+        else:
+            where_clause = {
+                "$and": [
+                    {"is_hive_mind": str(is_hive_mind)},
+                    {"user_id": user_id}
+                ]
+            }
+        
+        try:
+            results = self.chroma_collection.query(
+                query_embeddings=[_as_list(embedding)],
+                n_results=1,
+                where=where_clause,
+                include=["distances"]
+            )
+        except Exception as e:
+            logger.warning("Duplicate check failed", error=str(e))
+            return None
+        
+        ids = results["ids"][0] if results["ids"] else []
+        # The collection uses cosine space, so distance = 1 - similarity
+        if ids and 1.0 - results["distances"][0][0] > settings.duplicate_cosine_threshold:
+            return ids[0]
+        return None
+    
+    def _bump_hive_mind_version(self):
+        """Invalidate hive mind caches; locked so concurrent writes each get a new version."""
+        with self._hive_mind_version_lock:
+            self.hive_mind_version += 1
+    
+    def _reinforce_memory(self, memory_id: str, incoming: MemoryNode):
+        """Refresh an existing memory's recency when the same fact is seen again."""
+        self.memory_collection.update_one(
+            {"_id": memory_id},
+            {"$set": {"recency_value": 1.0, "timestamp": incoming.timestamp}}
+        )
+        if incoming.is_hive_mind:
+            self._bump_hive_mind_version()
+        logger.info("Duplicate memory reinforced", memory_id=memory_id, user_id=incoming.user_id)
+    
+    @staticmethod
+    def _chroma_metadata(memory: MemoryNode) -> Dict[str, Any]:
+        """Build the ChromaDB metadata used for filtering a memory."""
+        return {
+            "user_id": memory.user_id,
+            "memory_type": memory.memory_type.value,
+            "timestamp": memory.timestamp.isoformat(),
+            "is_hive_mind": str(memory.is_hive_mind),
+            "tags": ",".join(memory.tags) if memory.tags else ""
+        }
+    
+    def backfill_truncated_index(self, batch_size: int = 256) -> int:
+        """
+        Populate the truncated-vector index from embeddings stored in MongoDB.
+        
+        Run once after enabling retrieval_truncated_dim on an existing store
+        (``python -m src.memory.storage``); until then searches use the full index.
+        
+        Returns:
+            Number of memories written to the truncated index
+        """
+        if self.truncated_collection is None:
+            return 0
+        
+        written = 0
+        batch: List[MemoryNode] = []
+        for doc in self.memory_collection.find({"embedding": {"$ne": None}}):
+            doc.pop("_id", None)
+            batch.append(MemoryNode(**doc))
+            if len(batch) >= batch_size:
+                written += self._upsert_truncated(batch)
+                batch = []
+        if batch:
+            written += self._upsert_truncated(batch)
+        
+        self.truncated_ready = self._truncated_index_complete()
+        logger.info("Truncated index backfilled", count=written, dim=self.truncated_dim)
+        return written
+    
+    def _upsert_truncated(self, memories: List[MemoryNode]) -> int:
+        """Upsert a batch of memories into the truncated-vector index."""
+        self.truncated_collection.upsert(
+            ids=[m.memory_id for m in memories],
+            embeddings=[m.embedding[:self.truncated_dim] for m in memories],
+            metadatas=[self._chroma_metadata(m) for m in memories],
+            documents=[m.content for m in memories]
+        )
+        return len(memories)
+    
     def get_user_identity(self, user_id: str) -> Optional[UserIdentity]:
         """Retrieve user identity from MongoDB."""
         try:
@@ -108,7 +284,7 @@ class MemoryStorage:
     
     def search_memories(
         self,
-        query_embedding: List[float],
+        query_embedding: Union[List[float], np.ndarray],
         user_id: Optional[str] = None,
         is_hive_mind: bool = False,
         limit: int = 3,
@@ -160,9 +336,10 @@ class MemoryStorage:
                             ]
                         }
             
-            # Query ChromaDB
+            # Query ChromaDB; plain lists keep older chromadb releases (no ndarray support) working
+            query_vector = _as_list(query_embedding)
             query_kwargs = {
-                "query_embeddings": [query_embedding],
+                "query_embeddings": [query_vector],
                 "n_results": limit
             }
             
@@ -170,14 +347,25 @@ class MemoryStorage:
             if where_clause:
                 query_kwargs["where"] = where_clause
             
-            results = self.chroma_collection.query(**query_kwargs)
+            use_truncated = self.truncated_ready
+            if use_truncated:
+                # Stage 1: shortlist candidates on the cheaper truncated index
+                query_kwargs["query_embeddings"] = [query_vector[:self.truncated_dim]]
+                query_kwargs["n_results"] = max(limit, settings.retrieval_shortlist_k)
+                results = self.truncated_collection.query(**query_kwargs)
+            else:
+                results = self.chroma_collection.query(**query_kwargs)
             
             # Retrieve full memory documents from MongoDB
             memory_ids = results["ids"][0] if results["ids"] else []
             if not memory_ids:
                 return []
             
-            memory_docs = self.memory_collection.find({"_id": {"$in": memory_ids}})
+            memory_docs = list(self.memory_collection.find({"_id": {"$in": memory_ids}}))
+            
+            # Stage 2: re-rank the shortlist against the full-dimensional query
+            if use_truncated and len(memory_docs) > limit:
+                memory_docs = self._rerank_full(query_embedding, memory_docs, limit)
             
             memories = []
             for doc in memory_docs:
@@ -197,6 +385,24 @@ class MemoryStorage:
             logger.error("Failed to search memories", error=str(e))
             return []
     
+    @staticmethod
+    def _rerank_full(
+        query_embedding: Union[List[float], np.ndarray],
+        docs: List[Dict[str, Any]],
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """Keep the ``limit`` docs whose stored embeddings are closest by cosine."""
+        candidates = [doc for doc in docs if doc.get("embedding")]
+        if not candidates:
+            return docs[:limit]
+        
+        query = np.asarray(query_embedding, dtype=np.float32)
+        matrix = np.asarray([doc["embedding"] for doc in candidates], dtype=np.float32)
+        scores = (matrix @ query) / (
+            np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12
+        )
+        return [candidates[i] for i in np.argsort(-scores)[:limit]]
+    
     def get_recent_memories(
         self,
         user_id: Optional[str] = None,
@@ -228,3 +434,11 @@ class MemoryStorage:
         self.mongo_client.close()
         logger.info("Memory storage connections closed")
 
+
+if __name__ == "__main__":
+    # Backfill the truncated index after enabling RETRIEVAL_TRUNCATED_DIM
+    storage = MemoryStorage()
+    try:
+        print(f"Backfilled {storage.backfill_truncated_index()} memories")
+    finally:
+        storage.close()
@@ -2,9 +2,10 @@
 
 import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
-from pydantic_settings import BaseSettings
+from typing import Dict, Any, Iterator, Optional, Tuple
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
 
 
@@ -27,6 +28,10 @@ class Settings(BaseSettings):
         default="user_identities", env="MONGODB_USER_IDENTITY_COLLECTION"
     )
     
+    # Supabase (interaction log)
+    supabase_url: Optional[str] = Field(default=None, env="SUPABASE_URL")
+    supabase_service_role_key: Optional[str] = Field(default=None, env="SUPABASE_SERVICE_ROLE_KEY")
+    
     # Vector DB
     chroma_db_path: str = Field(default="./chroma_db", env="CHROMA_DB_PATH")
     chroma_collection_name: str = Field(
@@ -38,11 +43,46 @@ class Settings(BaseSettings):
     max_personal_memories: int = Field(default=3, env="MAX_PERSONAL_MEMORIES")
     max_hive_mind_memories: int = Field(default=3, env="MAX_HIVE_MIND_MEMORIES")
     embedding_model: str = Field(default="text-embedding-004", env="EMBEDDING_MODEL")
+    embedding_cache_size: int = Field(default=4096, env="EMBEDDING_CACHE_SIZE")
+    embedding_cache_ttl: int = Field(default=3600, env="EMBEDDING_CACHE_TTL")
+    hive_mind_cache_size: int = Field(default=1024, env="HIVE_MIND_CACHE_SIZE")
+    hive_mind_cache_ttl: int = Field(default=300, env="HIVE_MIND_CACHE_TTL")
+    
+    # Two-stage (Matryoshka) vector search; 0 disables the truncated index
+    retrieval_truncated_dim: int = Field(default=0, env="RETRIEVAL_TRUNCATED_DIM")
+    retrieval_shortlist_k: int = Field(default=50, env="RETRIEVAL_SHORTLIST_K")
+    # Workers for speculative/parallel retrieval lookups, shared by all requests
+    retrieval_pool_size: int = Field(default=32, env="RETRIEVAL_POOL_SIZE")
+    
+    # Retrieved memories more similar than this to a higher-ranked one are dropped
+    dedup_cosine_threshold: float = Field(default=0.92, env="DEDUP_COSINE_THRESHOLD")
+    # New memories more similar than this to a stored one reinforce it instead of being
+    # saved; opt-in (0 disables) since reinforcing keeps the stored content, not the new one
+    duplicate_cosine_threshold: float = Field(default=0.0, env="DUPLICATE_COSINE_THRESHOLD")
     
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        frozen=True,
+    )
+
+
+def _flatten(config: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, Any]]:
+    """Yield (dotted_key, value) for every key at every depth of a nested dict."""
+    for key, value in config.items():
+        path = f"{prefix}{key}"
+        yield path, value
+        if isinstance(value, dict):
+            yield from _flatten(value, f"{path}.")
+
+
+@lru_cache(maxsize=None)
+def _load_cached(path: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Parse a YAML config once per path; returns (nested, flattened) views."""
+    with open(path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+    return config, dict(_flatten(config))
 
 
 class ConfigLoader:
@@ -53,30 +93,28 @@ class ConfigLoader:
             config_path = Path(__file__).parent.parent.parent / "config" / "settings.yaml"
         self.config_path = Path(config_path)
         self._config: Optional[Dict[str, Any]] = None
+        self._flat: Dict[str, Any] = {}
     
     def load(self) -> Dict[str, Any]:
         """Load configuration from YAML file."""
         if self._config is None:
-            with open(self.config_path, "r", encoding="utf-8") as f:
-                self._config = yaml.safe_load(f)
+            self._config, self._flat = _load_cached(str(self.config_path.resolve()))
         return self._config
     
     def get(self, key_path: str, default: Any = None) -> Any:
         """Get configuration value by dot-separated key path."""
-        config = self.load()
-        keys = key_path.split(".")
-        value = config
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-                if value is None:
-                    return default
-            else:
-                return default
-        return value
+        self.load()
+        value = self._flat.get(key_path)
+        return default if value is None else value
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Build settings from the environment once per process."""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
 config_loader = ConfigLoader()
 